@@ -1,18 +1,20 @@
 #!/usr/bin/env python3
 """
 LIVE DEMO: TCP Reno Performance Test
-Shows real-time output suitable for presentation
+Runs one 30s test and prints its per-second report when it finishes,
+suitable for presentation
 """
 
+import json
 import os
 import sys
 import time
 from functools import partial
 from mininet.net import Mininet
 from mininet.node import RemoteController, OVSSwitch
-from mininet.link import TCLink
+from mininet.link import Link, TCLink
 from mininet.log import setLogLevel, info
-from simple_dumbbell import SimpleDumbbellTopo
+from simple_dumbbell import SimpleDumbbellTopo, BatchedHost, IP_BASE, build_batched
 
 def print_banner(text):
     """Print a nice banner"""
@@ -26,6 +28,27 @@ def print_section(text):
     print(f"  {text}")
     print("─"*70 + "\n")
 
+def print_iperf_report(output_json):
+    """Print per-interval and average throughput from iperf3 -J output"""
+    try:
+        report = json.loads(output_json)
+    except ValueError:
+        # Not JSON (e.g. iperf3 failed to start) - show it as-is
+        print(output_json)
+        return
+    
+    if 'error' in report:
+        print(f"✗ iperf3 error: {report['error']}")
+        return
+    
+    for interval in report.get('intervals', []):
+        summary = interval['sum']
+        print(f"  [{summary['start']:5.1f}-{summary['end']:5.1f} sec]  "
+              f"{summary['bits_per_second'] / 1_000_000:8.2f} Mbps")
+    
+    received = report.get('end', {}).get('sum_received', {})
+    print(f"\n  Average throughput: {received.get('bits_per_second', 0) / 1_000_000:.2f} Mbps")
+
 def main():
     """Run TCP Reno demo"""
     
@@ -78,32 +101,51 @@ def main():
     
     net = Mininet(
         topo=topo,
-        link=TCLink,
+        host=BatchedHost,
+        # Debug links have no tc params, so plain veths are enough there
+        link=TCLink if use_bottleneck else Link,
         controller=partial(RemoteController, ip='127.0.0.1', port=6633),
         switch=switch_class,
-        autoSetMacs=True
+        ipBase=IP_BASE,
+        autoSetMacs=True,
+        build=False
     )
     
     try:
         info("*** Starting network\n")
+        build_batched(net)  # all veth pairs in one ip -batch run
         net.start()
         
+        client = net.get('h1')
+        server = net.get('h13')
+        client_ip = client.IP()
+        server_ip = server.IP()
+        
         print_section("STEP 2: Waiting for Network Convergence")
-        info("*** Waiting for switches to connect to controller")
-        for i in range(20):
+        # Returns as soon as every switch has connected (Mininet reports
+        # each switch as it comes up) instead of always sleeping 20s
+        if not net.waitConnected(timeout=20):
+            print("✗ Controller did not connect - Make sure controller is running!\n")
+            return
+        
+        # Then probe the test path until the controller forwards traffic,
+        # for at most 40 x (1s timeout + 0.5s) instead of a fixed wait
+        info("*** Waiting for the controller to forward traffic")
+        for _ in range(40):
+            if '1 received' in client.cmd(f'ping -c 1 -W 1 {server_ip}'):
+                info(' Done!\n')
+                break
             info('.')
-            time.sleep(1)
-        info(' Done!\n')
+            time.sleep(0.5)
+        else:
+            info(f"\n  ⚠ Probe pings to {server.name} got no reply\n")
         
         print_section("STEP 3: Testing Connectivity")
         
-        client = net.get('h1')
-        server = net.get('h13')
-        
-        info(f"*** Test path: {client.name} ({client.IP()}) → {server.name} ({server.IP()})\n")
+        info(f"*** Test path: {client.name} ({client_ip}) → {server.name} ({server_ip})\n")
         
-        print("\n[Running: ping -c 3 10.0.0.13]")
-        result = client.cmd('ping -c 3 -W 2 10.0.0.13')
+        print(f"\n[Running: ping -c 3 {server_ip}]")
+        result = client.cmd(f'ping -c 3 -W 2 {server_ip}')
         print(result)
         
         if '3 received' in result or '2 received' in result:
@@ -120,31 +162,30 @@ def main():
         print(f"[Running on {server.name}: iperf3 -s]")
         server.cmd('iperf3 -s -D')
         time.sleep(2)
-        print(f"✓ iperf3 server started on {server.IP()}\n")
+        print(f"✓ iperf3 server started on {server_ip}\n")
         
         print_section("STEP 5: Running TCP Reno Performance Test")
         
         print("Protocol: TCP Reno")
         print("Congestion Control: Reno (classic AIMD)")
         print("Test Duration: 30 seconds")
-        print("Command: iperf3 -c 10.0.0.13 -C reno -t 30\n")
+        print(f"Command: iperf3 -c {server_ip} -C reno -t 30 -J\n")
         
         input("Press ENTER to start test...")
         print("\n" + "─"*70)
-        print("  LIVE RESULTS")
+        print("  RESULTS (printed when the 30s test finishes)")
         print("─"*70 + "\n")
         
-        # Run iperf3 WITHOUT -J flag so we see live output
-        output = client.cmd('iperf3 -c 10.0.0.13 -C reno -t 30')
-        print(output)
+        # Single run with -J: the per-second results shown here come from
+        # the same JSON that is saved for analysis
+        output_json = client.cmd(f'iperf3 -c {server_ip} -C reno -t 30 -J')
+        print_iperf_report(output_json)
         
         print("\n" + "─"*70)
         print("  TEST COMPLETE")
         print("─"*70 + "\n")
         
-        # Also save JSON version for analysis
         print("Saving detailed results for analysis...")
-        output_json = client.cmd('iperf3 -c 10.0.0.13 -C reno -t 5 -J')
         
         if not os.path.exists('experiment_results'):
             os.makedirs('experiment_results')
@@ -160,9 +201,9 @@ def main():
         print_section("STEP 6: Measuring Latency with Ping")
         
         print("Running 20 pings to measure round-trip time...\n")
-        print("[Running: ping -c 20 10.0.0.13]\n")
+        print(f"[Running: ping -c 20 {server_ip}]\n")
         
-        ping_output = client.cmd('ping -c 20 -i 0.2 10.0.0.13')
+        ping_output = client.cmd(f'ping -c 20 -i 0.2 {server_ip}')
         print(ping_output)
         
         # Save ping results
@@ -10,9 +10,9 @@ import time
 from functools import partial
 from mininet.net import Mininet
 from mininet.node import RemoteController, OVSSwitch
-from mininet.link import TCLink
+from mininet.link import Link, TCLink
 from mininet.log import setLogLevel, info
-from simple_dumbbell import SimpleDumbbellTopo
+from simple_dumbbell import SimpleDumbbellTopo, BatchedHost, IP_BASE, build_batched
 
 def print_banner(text):
     """Print a nice banner"""
@@ -78,22 +78,25 @@ def main():
     
     net = Mininet(
         topo=topo,
-        link=TCLink,
+        host=BatchedHost,
+        # Debug links have no tc params, so plain veths are enough there
+        link=TCLink if use_bottleneck else Link,
         controller=partial(RemoteController, ip='127.0.0.1', port=6633),
         switch=switch_class,
-        autoSetMacs=True
+        ipBase=IP_BASE,
+        autoSetMacs=True,
+        build=False
     )
     
     try:
         info("*** Starting network\n")
+        build_batched(net)  # all veth pairs in one ip -batch run
         net.start()
         
         print_section("STEP 2: Waiting for Network Convergence")
-        info("*** Waiting for switches to connect to controller")
-        for i in range(20):
-            info('.')
-            time.sleep(1)
-        info(' Done!\n')
+        info("*** Waiting 20s for switches to connect to controller...\n")
+        time.sleep(20)
+        info("  Done!\n")
         
         print_section("STEP 3: Testing Connectivity")
         
@@ -11,6 +11,12 @@ Then open in MiniEdit:
 """
 
 import json
+from link_params import bdp_queue_packets
+
+try:
+    import orjson  # Optional: much faster JSON serialization
+except ImportError:
+    orjson = None
 
 def generate_miniedit_topology():
     """
@@ -74,20 +80,25 @@ def generate_miniedit_topology():
         's6': (800, 450)
     }
     
+    # Node numbers parsed once from the names ('s1' -> 1, 'r2' -> 2)
+    switch_numbers = {name: int(''.join(c for c in name if c.isdigit()))
+                      for name in switch_positions}
+    
     # Create switches
-    for switch_name, (x, y) in switch_positions.items():
-        switch = {
-            "number": switch_name.replace('s', '').replace('r', ''),
+    topology['switches'] = [
+        {
+            "number": str(switch_numbers[switch_name]),
             "opts": {
                 "controllers": ["c0"],
                 "hostname": switch_name,
-                "nodeNum": int(switch_name.replace('s', '').replace('r', '')),
+                "nodeNum": switch_numbers[switch_name],
                 "switchType": "ovs"
             },
             "x": str(x),
             "y": str(y)
         }
-        topology['switches'].append(switch)
+        for switch_name, (x, y) in switch_positions.items()
+    ]
     
     # Define host positions
     # Left side hosts
@@ -128,104 +139,71 @@ def generate_miniedit_topology():
     
     all_hosts = {**left_hosts, **right_hosts}
     
+    host_numbers = {name: int(name[1:]) for name in all_hosts}
+    
     # Create hosts
-    for host_name, (x, y) in all_hosts.items():
-        host_num = int(host_name.replace('h', ''))
-        host = {
-            "number": str(host_num),
+    topology['hosts'] = [
+        {
+            "number": str(host_numbers[host_name]),
             "opts": {
                 "hostname": host_name,
-                "nodeNum": host_num,
+                "nodeNum": host_numbers[host_name],
                 "sched": "host"
             },
             "x": str(x),
             "y": str(y)
         }
-        topology['hosts'].append(host)
+        for host_name, (x, y) in all_hosts.items()
+    ]
     
     # Create links
-    links = []
-    
-    # Left side switch-to-router links (1Gbps)
-    links.append({"src": "s1", "dest": "r1", "bw": 1000})
-    links.append({"src": "s2", "dest": "r1", "bw": 1000})
-    links.append({"src": "s3", "dest": "r1", "bw": 1000})
-    
-    # Right side switch-to-router links (1Gbps)
-    links.append({"src": "s4", "dest": "r2", "bw": 1000})
-    links.append({"src": "s5", "dest": "r2", "bw": 1000})
-    links.append({"src": "s6", "dest": "r2", "bw": 1000})
-    
-    # BOTTLENECK LINK (r1 <-> r2)
-    links.append({
-        "src": "r1", 
-        "dest": "r2", 
-        "bw": 10,           # 10 Mbps
-        "delay": "50ms",    # 50ms delay
-        "loss": 1,          # 1% loss
-        "max_queue_size": 100
-    })
-    
-    # Host-to-switch links
-    # s1 hosts
-    for i in range(1, 5):
-        links.append({"src": f"h{i}", "dest": "s1"})
-    
-    # s2 hosts
-    for i in range(5, 9):
-        links.append({"src": f"h{i}", "dest": "s2"})
-    
-    # s3 hosts
-    links.append({"src": "h21", "dest": "s3"})
-    links.append({"src": "h22", "dest": "s3"})
-    
-    # s4 hosts
-    for i in range(9, 13):
-        links.append({"src": f"h{i}", "dest": "s4"})
-    
-    # s5 hosts
-    for i in range(13, 17):
-        links.append({"src": f"h{i}", "dest": "s5"})
-    
-    # s6 hosts
-    for i in range(17, 21):
-        links.append({"src": f"h{i}", "dest": "s6"})
-    
-    # Convert links to MiniEdit format
-    for link in links:
-        src = link['src']
-        dest = link['dest']
-        
-        link_obj = {
-            "dest": dest,
-            "opts": {},
-            "src": src
-        }
+    links = [
+        # Switch-to-router links (1Gbps): s1-s3 on the left, s4-s6 on the right
+        *({"src": switch, "dest": core, "bw": 1000}
+          for switch, core in (("s1", "r1"), ("s2", "r1"), ("s3", "r1"),
+                               ("s4", "r2"), ("s5", "r2"), ("s6", "r2"))),
         
-        # Add bandwidth if specified
-        if 'bw' in link:
-            link_obj['opts']['bw'] = link['bw']
-        
-        # Add delay if specified
-        if 'delay' in link:
-            link_obj['opts']['delay'] = link['delay']
-        
-        # Add loss if specified
-        if 'loss' in link:
-            link_obj['opts']['loss'] = link['loss']
-        
-        # Add max_queue_size if specified
-        if 'max_queue_size' in link:
-            link_obj['opts']['max_queue_size'] = link['max_queue_size']
+        # BOTTLENECK LINK (r1 <-> r2)
+        {
+            "src": "r1", 
+            "dest": "r2", 
+            "bw": 10,           # 10 Mbps
+            "delay": "50ms",    # 50ms delay
+            "loss": 1,          # 1% loss
+            "max_queue_size": bdp_queue_packets(10, '50ms')  # as SimpleDumbbellTopo
+        },
         
-        topology['links'].append(link_obj)
+        # Host-to-switch links
+        *({"src": f"h{i}", "dest": "s1"} for i in range(1, 5)),
+        *({"src": f"h{i}", "dest": "s2"} for i in range(5, 9)),
+        {"src": "h21", "dest": "s3"},
+        {"src": "h22", "dest": "s3"},
+        *({"src": f"h{i}", "dest": "s4"} for i in range(9, 13)),
+        *({"src": f"h{i}", "dest": "s5"} for i in range(13, 17)),
+        *({"src": f"h{i}", "dest": "s6"} for i in range(17, 21)),
+    ]
+    
+    # Convert links to MiniEdit format, keeping only the options each link sets
+    link_options = ('bw', 'delay', 'loss', 'max_queue_size')
+    topology['links'] = [
+        {
+            "dest": link['dest'],
+            "opts": {key: link[key] for key in link_options if key in link},
+            "src": link['src']
+        }
+        for link in links
+    ]
     
     return topology
 
 def save_topology(topology, filename='dumbbell_topology.mn'):
     """Save topology to MiniEdit format"""
-    with open(filename, 'w') as f:
-        json.dump(topology, f, indent=2)
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(topology, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filename, 'w') as f:
+            json.dump(topology, f, indent=2)
     print(f"✓ MiniEdit topology saved to: {filename}")
     print(f"\nTo open in MiniEdit:")
     print(f"  sudo ~/mininet/examples/miniedit.py {filename}")
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+link_params.py - Shared link parameter helpers
+
+Delay parsing and bottleneck queue sizing used by both simple_dumbbell.py
+and generate_miniedit_topology.py. Plain Python with no Mininet imports,
+so the MiniEdit generator still runs on machines without Mininet.
+"""
+
+import re
+
+def parse_ms(delay):
+    """
+    Link delay as a float in ms: '50ms' -> 50.0
+    Also takes the 'us' and 's' suffixes tc accepts, or a bare number (ms)
+    """
+    match = re.fullmatch(r'\s*(\d+(?:\.\d*)?)\s*(us|ms|s)?\s*', str(delay))
+    if not match:
+        raise ValueError(f"Can't parse link delay {delay!r}")
+    return float(match[1]) * {'us': 1e-3, 'ms': 1, 's': 1e3}[match[2] or 'ms']
+
+def bdp_queue_packets(bw, delay):
+    """
+    Queue size in 1500-byte packets holding one bandwidth-delay product of a
+    link with bw Mbps and one-way delay (RTT = 2x delay), at least 10;
+    83 for the 10Mbps/50ms bottleneck
+    """
+    return max(10, int(bw * 1e6 * 2 * parse_ms(delay) / 1e3 / (1500 * 8)))
@@ -9,10 +9,29 @@ This will check:
 3. Can basic connectivity work?
 """
 
+import asyncio
+import json
+import socket
 import subprocess
 import sys
 import time
 import os
+import re
+import traceback
+from mininet.net import Mininet
+from mininet.node import RemoteController
+from mininet.topo import SingleSwitchTopo
+from mininet.log import setLogLevel
+
+# Scratch OVS bridge used by the connectivity test's fast path
+DIAG_BRIDGE = "diagtest"
+
+# Commands behind the basic checks, run concurrently by run_basic_checks
+RYU_PROCESS_CMD = "ps aux | grep ryu-manager | grep -v grep"
+LIST_BRIDGES_CMD = "ovs-vsctl -f json --columns=name,controller list Bridge"
+
+# Reply count from ping's summary line ("3 packets transmitted, 3 received, ...")
+_RECV_RE = re.compile(r'(\d+) received')
 
 def print_header(text):
     print("\n" + "="*70)
@@ -36,11 +55,29 @@ def run_command(cmd, capture=True):
     except Exception as e:
         return -1, "", str(e)
 
-def check_ryu_process():
-    """Check if Ryu controller is running"""
+async def run_command_async(cmd, timeout=5):
+    """Run command without blocking other checks and return output"""
+    try:
+        proc = await asyncio.create_subprocess_shell(
+            cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return -1, "", "Command timed out"
+        return proc.returncode, stdout.decode(), stderr.decode()
+    except Exception as e:
+        return -1, "", str(e)
+
+def check_ryu_process(result=None):
+    """
+    Check if Ryu controller is running
+    result is the output of RYU_PROCESS_CMD if it was already run
+    """
     print_check("Is Ryu controller running?")
     
-    code, stdout, stderr = run_command("ps aux | grep ryu-manager | grep -v grep")
+    code, stdout, stderr = result or run_command(RYU_PROCESS_CMD)
     
     if code == 0 and "ryu-manager" in stdout:
         print("  ✓ Ryu controller process found")
@@ -56,52 +93,88 @@ def check_controller_port():
     """Check if controller is listening on port 6633"""
     print_check("Is controller listening on port 6633?")
     
-    # Try ss first
-    code, stdout, stderr = run_command("sudo ss -tlnp | grep 6633")
+    # A TCP connect only succeeds if something is listening, without
+    # forking (sudo) ss/netstat
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.2)
+        code = sock.connect_ex(('127.0.0.1', 6633))
     
-    if code != 0:
-        # Try netstat as fallback
-        code, stdout, stderr = run_command("sudo netstat -tlnp | grep 6633")
-    
-    if code == 0 and "6633" in stdout:
+    if code == 0:
         print("  ✓ Port 6633 is listening")
-        print(f"  Details: {stdout.strip()[:80]}...")
         return True
     else:
         print("  ✗ Port 6633 NOT listening!")
         print("  FIX: Make sure Ryu is running")
         return False
 
-def check_mininet_clean():
-    """Check if Mininet is clean"""
+def check_mininet_clean(result=None):
+    """
+    Check if Mininet is clean
+    result is the output of LIST_BRIDGES_CMD if it was already run
+    """
     print_check("Is Mininet environment clean?")
     
-    code, stdout, stderr = run_command("sudo ovs-vsctl list-br")
+    code, stdout, stderr = result or run_command(LIST_BRIDGES_CMD)
+    
+    # Rows are [name, controller]; an empty controller column is ["set", []]
+    bridges = []
+    if code == 0:
+        try:
+            bridges = json.loads(stdout)['data']
+        except (ValueError, KeyError):
+            bridges = []
     
-    if code == 0 and stdout.strip():
+    if bridges:
         print("  ⚠ Old Mininet bridges found:")
-        for bridge in stdout.strip().split('\n'):
-            print(f"    - {bridge}")
+        print("\n".join(
+            f"    - {name}" + ("" if controller == ["set", []] else " (controller attached)")
+            for name, controller in bridges))
         print("  FIX: Run 'sudo mn -c' to clean up")
         return False
     else:
         print("  ✓ Mininet is clean (no old bridges)")
         return True
 
+def check_scratch_bridge(timeout=2):
+    """
+    Attach a scratch OVS bridge to the controller and wait for it to connect
+    Much quicker than bringing up a Mininet network; the bridge is always removed
+    Returns True if the controller accepted the connection within timeout seconds
+    """
+    code, stdout, stderr = run_command(
+        f"ovs-vsctl --may-exist add-br {DIAG_BRIDGE}"
+        f" -- set Bridge {DIAG_BRIDGE} protocols=OpenFlow10,OpenFlow13"
+        f" -- set-controller {DIAG_BRIDGE} tcp:127.0.0.1:6633")
+    if code != 0:
+        return False
+    
+    try:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            code, stdout, stderr = run_command(
+                f"ovs-vsctl get Controller {DIAG_BRIDGE} is_connected")
+            if code == 0 and stdout.strip() == "true":
+                return True
+            time.sleep(0.1)
+        return False
+    finally:
+        run_command(f"ovs-vsctl --if-exists del-br {DIAG_BRIDGE}")
+
 def test_basic_connectivity():
     """Test basic Mininet + Ryu connectivity"""
     print_check("Testing basic Mininet + Ryu connectivity...")
     
+    # Fast path: a switch that connects to the controller is usually enough
+    print("  Connecting a scratch OVS bridge to the controller...")
+    if check_scratch_bridge():
+        print("  ✓ Scratch bridge connected - skipping the Mininet test")
+        return True
+    
+    print("  ⚠ Scratch bridge did not connect, falling back to a full test")
     print("  Creating simple 2-host network...")
     print("  (This will take ~15 seconds)")
     
-    # Import here to avoid issues if Mininet not available
     try:
-        from mininet.net import Mininet
-        from mininet.node import RemoteController
-        from mininet.topo import SingleSwitchTopo
-        from mininet.log import setLogLevel
-        
         setLogLevel('error')  # Quiet output
         
         # Create simple network
@@ -120,7 +193,8 @@ def test_basic_connectivity():
         net.stop()
         
         # Check result
-        if ' 0 received' in result or '100% packet loss' in result:
+        match = _RECV_RE.search(result)
+        if not match or int(match.group(1)) == 0:
             print("  ✗ Ping test FAILED - no connectivity")
             print("  This means Ryu isn't properly controlling switches")
             return False
@@ -133,6 +207,21 @@ def test_basic_connectivity():
         print(f"  ✗ Test failed with error: {e}")
         return False
 
+async def run_basic_checks():
+    """
+    Run the basic checks' commands concurrently, then report them in order
+    Returns dict mapping check name -> passed
+    """
+    ryu_process, bridges = await asyncio.gather(
+        run_command_async(RYU_PROCESS_CMD),
+        run_command_async(LIST_BRIDGES_CMD))
+    
+    return {
+        "Ryu Process": check_ryu_process(ryu_process),
+        "Controller Port": check_controller_port(),
+        "Mininet Clean": check_mininet_clean(bridges),
+    }
+
 def main():
     """Run all diagnostic checks"""
     
@@ -141,11 +230,7 @@ def main():
     print("Running checks...")
     
     # Run all checks
-    checks = {
-        "Ryu Process": check_ryu_process(),
-        "Controller Port": check_controller_port(),
-        "Mininet Clean": check_mininet_clean(),
-    }
+    checks = asyncio.run(run_basic_checks())
     
     # Summary
     print_header("DIAGNOSTIC SUMMARY")
@@ -206,6 +291,5 @@ if __name__ == '__main__':
         sys.exit(1)
     except Exception as e:
         print(f"\n\nUnexpected error: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+results_io.py - Shared result loading for the analysis scripts
+
+Parses the iperf3 JSON and ping output saved by the experiment runners into
+per controller/mode/protocol metrics. Used by both analyze_results.py and
+analyze_results_presentation.py.
+"""
+
+import json
+import os
+import pickle
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson  # Optional: much faster JSON parsing
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # Optional: streams large iperf3 JSON files
+except ImportError:
+    ijson = None
+
+try:
+    import msgspec  # Optional: decodes only the iperf3 'end' summary
+except ImportError:
+    msgspec = None
+
+RESULTS_DIR = "experiment_results"
+
+# On-disk cache of parsed experiments, so unchanged results are not re-parsed on reruns
+PARSE_CACHE = os.path.join(RESULTS_DIR, ".parse_cache.pkl")
+
+# Part of every cache stamp: bump whenever parse_one (or the parsers it
+# calls) changes what it returns, so older cached results are re-parsed
+_CACHE_VERSION = 1
+
+# Files of the old shelve-based cache, removed the next time PARSE_CACHE is saved
+_OLD_CACHE_FILES = tuple(os.path.join(RESULTS_DIR, ".parse_cache" + suffix)
+                         for suffix in ("", ".db", ".dat", ".dir", ".bak"))
+
+# Chunk size for streamed reads (ijson defaults to 64 KiB)
+READ_CHUNK_BYTES = 128 * 1024
+
+# Decode errors raised by whichever JSON backends are installed
+_JSON_ERRORS = ((json.JSONDecodeError,)
+                + ((orjson.JSONDecodeError,) if orjson else ())
+                + ((ijson.JSONError,) if ijson else ())
+                + ((msgspec.DecodeError,) if msgspec else ()))
+
+# Without msgspec, iperf3 files at least this big are streamed with ijson
+# instead of loaded whole
+IPERF_STREAM_MIN_BYTES = 64 * 1024
+
+# Loss and RTT summary lines, matched in a single pass over the raw ping
+# output bytes (no text decoding needed)
+_PING_RE = re.compile(rb'(?P<loss>\d+)% packet loss|'
+                      rb'rtt min/avg/max/mdev = (?P<min>[\d.]+)/(?P<avg>[\d.]+)/'
+                      rb'(?P<max>[\d.]+)/(?P<mdev>[\d.]+)')
+
+if msgspec:
+    # Typed partial decode: only the fields parse_iperf_json reads are
+    # declared, every other key is skipped unparsed; fields missing from
+    # the file stay UNSET and are left out by to_builtins()
+    _Unset = msgspec.UnsetType
+    
+    class _IperfSum(msgspec.Struct):
+        """An iperf3 'end' summary (sum_sent, sum_received or sum)"""
+        bits_per_second: float | _Unset = msgspec.UNSET
+        retransmits: int | _Unset = msgspec.UNSET
+        lost_percent: float | _Unset = msgspec.UNSET
+        jitter_ms: float | _Unset = msgspec.UNSET
+    
+    class _IperfEnd(msgspec.Struct):
+        """iperf3 'end' object, reduced to its totals"""
+        sum_sent: _IperfSum | _Unset = msgspec.UNSET
+        sum_received: _IperfSum | _Unset = msgspec.UNSET
+        sum: _IperfSum | _Unset = msgspec.UNSET
+    
+    class _IperfDoc(msgspec.Struct):
+        """iperf3 JSON document, reduced to its 'end' totals"""
+        end: _IperfEnd = msgspec.field(default_factory=_IperfEnd)
+    
+    _iperf_decoder = msgspec.json.Decoder(_IperfDoc)
+
+def _load_parse_cache():
+    """
+    Load PARSE_CACHE
+    Returns dict mapping iperf3 file path -> (stamp, parse_one result);
+    empty if there is no usable cache
+    """
+    try:
+        with open(PARSE_CACHE, 'rb') as f:
+            cache = pickle.load(f)
+    except Exception:
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _save_parse_cache(cache):
+    """Write PARSE_CACHE atomically, so a concurrent run never reads half a file"""
+    tmp_file = PARSE_CACHE + ".tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, PARSE_CACHE)
+    except OSError:
+        # Cache unavailable (e.g. read-only results dir) - just skip it
+        return
+    
+    for old_file in _OLD_CACHE_FILES:
+        try:
+            os.remove(old_file)
+        except OSError:
+            pass
+
+def _read_file(filepath):
+    """
+    Read a whole file as bytes
+    Unbuffered, so readall() sizes one read() from fstat instead of
+    copying through an 8 KiB buffer
+    """
+    with open(filepath, 'rb', buffering=0) as f:
+        return f.read()
+
+def _load_iperf_end(filepath):
+    """
+    Load the 'end' summary object of an iperf3 JSON file
+    The per-interval data is never materialized: msgspec skips it while
+    decoding, otherwise long runs are streamed with ijson
+    """
+    if msgspec:
+        return msgspec.to_builtins(_iperf_decoder.decode(_read_file(filepath)).end)
+    
+    if ijson and os.path.getsize(filepath) >= IPERF_STREAM_MIN_BYTES:
+        with open(filepath, 'rb', buffering=0) as f:
+            return {key: value
+                    for key, value in ijson.kvitems(f, 'end', use_float=True,
+                                                    buf_size=READ_CHUNK_BYTES)
+                    if key in ('sum_sent', 'sum_received', 'sum')}
+    
+    raw = _read_file(filepath)
+    data = orjson.loads(raw) if orjson else json.loads(raw)
+    return data.get('end', {})
+
+def parse_iperf_json(filepath):
+    """
+    Parse iperf3 JSON output
+    Returns dict with all available metrics
+    """
+    try:
+        end = _load_iperf_end(filepath)
+        
+        result = {}
+        
+        # TCP uses sum_received for throughput
+        if 'sum_received' in end:
+            bits_per_second = end['sum_received'].get('bits_per_second', 0)
+            result['throughput_mbps'] = bits_per_second / 1_000_000
+            result['protocol_type'] = 'TCP'
+        
+        # UDP uses sum for all metrics
+        if 'sum' in end:
+            sum_data = end['sum']
+            
+            # UDP throughput (if not already set by TCP's sum_received)
+            if 'throughput_mbps' not in result and 'bits_per_second' in sum_data:
+                result['throughput_mbps'] = sum_data['bits_per_second'] / 1_000_000
+                result['protocol_type'] = 'UDP'
+            
+            # UDP-specific metrics
+            if 'jitter_ms' in sum_data:
+                result['jitter_ms'] = sum_data['jitter_ms']
+            
+            # CRITICAL: UDP packet loss from iperf3 (e.g., 75%)
+            # This should NOT be overwritten by ping's loss (0%)
+            if 'lost_percent' in sum_data:
+                result['iperf_packet_loss_percent'] = sum_data['lost_percent']
+        
+        return result
+    
+    except _JSON_ERRORS as e:
+        print(f"  ✗ JSON decode error in {filepath}: {e}")
+        return None
+    except Exception as e:
+        print(f"  ✗ Error parsing {filepath}: {e}")
+        return None
+
+def parse_ping_output(filepath):
+    """
+    Parse ping output for latency and packet loss
+    Returns dict with ping metrics
+    """
+    try:
+        content = _read_file(filepath)
+        
+        result = {}
+        
+        for match in _PING_RE.finditer(content):
+            if match.group('loss') is not None:
+                # Extract ping packet loss (ICMP)
+                # Note: This is different from UDP's iperf3 packet loss
+                result['ping_packet_loss_percent'] = float(match.group('loss'))
+            else:
+                # Extract RTT (round-trip time)
+                (result['rtt_min_ms'], result['rtt_avg_ms'],
+                 result['rtt_max_ms'], result['rtt_mdev_ms']) = map(
+                    float, match.group('min', 'avg', 'max', 'mdev'))
+        
+        return result
+    
+    except Exception as e:
+        print(f"  ✗ Error parsing {filepath}: {e}")
+        return None
+
+def parse_one(experiment):
+    """
+    Parse the iperf3 and ping files of one experiment and merge them
+    experiment is a (controller, mode, protocol, iperf_file, ping_file) tuple;
+    ping_file is None if the experiment has no ping file
+    Returns (key, iperf_data, ping_data, metrics), where key is
+    (controller, mode, protocol) and metrics is the merged dict
+    """
+    ctrl, mode, protocol, iperf_file, ping_file = experiment
+    iperf_data = parse_iperf_json(iperf_file)
+    ping_data = parse_ping_output(ping_file) if ping_file else None
+    
+    metrics = dict(iperf_data) if iperf_data else {}
+    
+    if ping_data:
+        if 'rtt_avg_ms' in ping_data:
+            metrics['rtt_avg_ms'] = ping_data['rtt_avg_ms']
+        
+        # CRITICAL: Handle packet loss carefully
+        # - For TCP: Use ping's packet loss (TCP iperf3 doesn't report loss)
+        # - For UDP: Use iperf3's packet loss (NOT ping's 0%)
+        if protocol != 'udp':
+            if 'ping_packet_loss_percent' in ping_data:
+                metrics['packet_loss_percent'] = ping_data['ping_packet_loss_percent']
+        elif 'iperf_packet_loss_percent' in metrics:
+            metrics['packet_loss_percent'] = metrics['iperf_packet_loss_percent']
+    
+    return (ctrl, mode, protocol), iperf_data, ping_data, metrics
+
+def analyze_results(controller=None):
+    """
+    Load and analyze experimental results
+    If controller is given (e.g. 'pox'), only that controller's results are loaded
+    Properly handles UDP vs TCP packet loss sources
+    Returns dict mapping (controller, mode, protocol) -> metrics dict
+    """
+    
+    print("\n" + "="*70)
+    print(f"  ANALYZING {controller.upper() + ' ' if controller else ''}RESULTS")
+    print("="*70 + "\n")
+    
+    if not os.path.exists(RESULTS_DIR):
+        print(f"✗ Results directory not found: {RESULTS_DIR}/")
+        return None
+    
+    results = {}
+    experiments = []
+    
+    with os.scandir(RESULTS_DIR) as it:
+        entries = {entry.name: entry for entry in it if entry.is_file()}
+    
+    # Cached parses are reused while the iperf3 and ping files are unchanged;
+    # the stamps come from the directory scan, so no extra stat calls
+    cache = _load_parse_cache()
+    stamps = []
+    
+    for filename, entry in entries.items():
+        if not filename.endswith('_iperf.json'):
+            continue
+        
+        # Skip results from other controllers
+        if controller and not filename.startswith(f'{controller}_'):
+            continue
+        
+        # <controller>_<mode>_<protocol>_iperf.json; maxsplit=3 so a name
+        # with extra fields still yields a 4th part and is rejected
+        stem = filename.removesuffix('_iperf.json')
+        parts = stem.split('_', 3)
+        if len(parts) != 3 or not all(parts):
+            print(f"⚠ Skipping malformed filename: {filename}")
+            continue
+        
+        # Companion ping files are looked up in the scan instead of stat'ing each one
+        ping_entry = entries.get(stem + '_ping.txt')
+        ping_file = ping_entry.path if ping_entry else None
+        
+        st = entry.stat()
+        stamp = (_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+        if ping_entry:
+            st = ping_entry.stat()
+            stamp += (st.st_mtime_ns, st.st_size)
+        
+        experiments.append((*parts, entry.path, ping_file))
+        stamps.append(stamp)
+    
+    loaded = [None] * len(experiments)
+    misses = []
+    for i, (exp, stamp) in enumerate(zip(experiments, stamps)):
+        cached = cache.get(exp[3])
+        if cached and cached[0] == stamp:
+            loaded[i] = cached[1]
+        else:
+            misses.append(i)
+    
+    # Parse and merge the remaining files in worker processes (JSON and regex
+    # parsing hold the GIL), then report in listing order
+    if misses:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            parsed = pool.map(parse_one, [experiments[i] for i in misses], chunksize=16)
+            for i, result in zip(misses, parsed):
+                loaded[i] = result
+                
+                # Failed parses are not cached so they are retried next run
+                _, iperf_data, ping_data, _ = result
+                if iperf_data is not None and (experiments[i][4] is None or ping_data is not None):
+                    cache[experiments[i][3]] = (stamps[i], result)
+    
+    # Drop entries for deleted files so the cache only tracks what is on disk
+    stale = [path for path in cache if os.path.basename(path) not in entries]
+    for path in stale:
+        del cache[path]
+    
+    if misses or stale:
+        _save_parse_cache(cache)
+    
+    for (ctrl, mode, protocol, _, ping_file), (key, iperf_data, ping_data, metrics) in zip(experiments, loaded):
+        # Each experiment's report is built up and written in one call
+        lines = [f"Processing: {ctrl}/{mode}/{protocol}"]
+        
+        # Each experiment has exactly one _iperf.json, so its merged metrics
+        # dict from parse_one is stored as-is
+        results[key] = metrics
+        
+        # Parsed iperf3 data
+        if iperf_data:
+            throughput = iperf_data.get('throughput_mbps', 0)
+            lines.append(f"  ✓ Throughput: {throughput:.2f} Mbps")
+            
+            # Show UDP-specific metrics
+            if protocol == 'udp':
+                if 'iperf_packet_loss_percent' in iperf_data:
+                    loss = iperf_data['iperf_packet_loss_percent']
+                    lines.append(f"  ✓ UDP Packet Loss (iperf3): {loss:.2f}%")
+                if 'jitter_ms' in iperf_data:
+                    jitter = iperf_data['jitter_ms']
+                    lines.append(f"  ✓ Jitter: {jitter:.2f} ms")
+        else:
+            lines.append(f"  ✗ Failed to parse iperf data")
+        
+        # Parsed ping data; packet loss was already picked per protocol in parse_one
+        if ping_file:
+            if ping_data:
+                if 'rtt_avg_ms' in ping_data:
+                    lines.append(f"  ✓ RTT avg: {ping_data['rtt_avg_ms']:.2f} ms")
+                
+                if 'ping_packet_loss_percent' in ping_data:
+                    if protocol != 'udp':
+                        lines.append(f"  ✓ Packet Loss (ping): {ping_data['ping_packet_loss_percent']:.1f}%")
+                    else:
+                        lines.append(f"  ℹ Ping Loss: {ping_data['ping_packet_loss_percent']:.1f}% (not used, using iperf3 loss)")
+            else:
+                lines.append(f"  ✗ Failed to parse ping data")
+        else:
+            lines.append(f"  ⚠ Ping file not found: {ctrl}_{mode}_{protocol}_ping.txt")
+        
+        sys.stdout.write("\n".join(lines) + "\n\n")
+    
+    return results
+
+def print_summary_table(results):
+    """Print a summary table of all results"""
+    
+    # Build the whole table first and write it in one call
+    lines = ["", "="*70, "  RESULTS SUMMARY", "="*70, ""]
+    
+    for controller in sorted({key[0] for key in results}):
+        lines += ["", f"Controller: {controller.upper()}", "-" * 70]
+        
+        for mode in sorted({key[1] for key in results if key[0] == controller}):
+            lines += ["",
+                      f"  Mode: {mode.upper()}",
+                      f"  {'Protocol':<10} {'Throughput':<15} {'RTT Avg':<12} {'Loss %':<10} {'Jitter'}",
+                      f"  {'-'*10} {'-'*15} {'-'*12} {'-'*10} {'-'*10}"]
+            
+            for protocol in ['reno', 'cubic', 'udp']:
+                data = results.get((controller, mode, protocol))
+                if data is None:
+                    continue
+                
+                throughput = data.get('throughput_mbps', 0)
+                rtt = data.get('rtt_avg_ms', 0)
+                loss = data.get('packet_loss_percent', 0)
+                jitter = data.get('jitter_ms', 0)
+                
+                lines.append(f"  {protocol:<10} {throughput:>10.2f} Mbps  {rtt:>8.2f} ms  "
+                             f"{loss:>7.1f} %  {jitter:>8.2f} ms")
+    
+    sys.stdout.write("\n".join(lines) + "\n")
@@ -8,78 +8,169 @@ Clean Experiment Runner for 5718 Protocol Study
 FIXED: Better handling of learning switches (Ryu/POX)
 """
 
+import csv
 import os
+import re
+import socket
 import sys
 import time
 import subprocess
+import traceback
 from functools import partial
 from mininet.net import Mininet
 from mininet.node import RemoteController, OVSSwitch
-from mininet.link import TCLink
-from mininet.log import setLogLevel, info
-from simple_dumbbell import SimpleDumbbellTopo
+from mininet.link import Link, TCLink
+from mininet.log import setLogLevel, info, warn
+from simple_dumbbell import SimpleDumbbellTopo, BatchedHost, IP_BASE, build_batched
 
 OUTPUT_DIR = "experiment_results"
 TEST_DURATION = 30  
 PING_COUNT = 100   
 
+# Reply count from ping's summary line ("5 packets transmitted, 4 received, ...")
+_RECV_RE = re.compile(r'(\d+) received')
+
+def received_count(ping_output):
+    """Return the number of replies ping reported receiving (0 if no summary)"""
+    match = _RECV_RE.search(ping_output)
+    return int(match.group(1)) if match else 0
+
 def ensure_output_dir():
     """Create output directory if it doesn't exist"""
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
         print(f"Created output directory: {OUTPUT_DIR}/")
 
+def connected_bridges():
+    """
+    Ask OVS which bridges have a connected controller, in one ovs-vsctl call
+    The Controller table has no bridge name, so Bridge rows are listed too
+    to map each bridge to its controller records
+    Returns set of bridge names, or None if ovs-vsctl fails
+    """
+    try:
+        result = subprocess.run(
+            ['ovs-vsctl', '-f', 'csv', '--data=bare',
+             '--columns=name,controller', 'list', 'Bridge', '--',
+             '--columns=_uuid,is_connected', 'list', 'Controller'],
+            capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    
+    bridge_controllers = {}
+    connected = set()
+    table = None
+    for row in csv.reader(result.stdout.splitlines()):
+        if not row:
+            continue
+        # Each table starts with its CSV heading row
+        if row in (['name', 'controller'], ['_uuid', 'is_connected']):
+            table = row[0]
+        elif table == 'name' and len(row) == 2:
+            bridge_controllers[row[0]] = row[1].split()
+        elif table == '_uuid' and len(row) == 2:
+            if row[1] == 'true':
+                connected.add(row[0])
+        else:
+            return None
+    
+    return {name for name, uuids in bridge_controllers.items()
+            if connected.intersection(uuids)}
+
 def wait_for_convergence(net, timeout=40):
     """
     Wait for network to converge (all switches connected)
-    FIXED: Increased from 20 to 40 seconds for learning switches
+    Polls OVS and returns as soon as every switch reports a connected
+    controller, waiting at most timeout seconds
     """
-    info("*** Waiting for network convergence")
-    for i in range(timeout):
-        info('.')
-        time.sleep(1)
-    info(' Done!\n')
+    # Exactly two log lines, however long the wait takes
+    info(f"*** Waiting up to {timeout}s for network convergence...\n")
+    expected = {switch.name for switch in net.switches}
+    start = time.monotonic()
+    deadline = start + timeout
+    connected = set()
+    
+    while time.monotonic() < deadline:
+        connected = connected_bridges()
+        if connected is None:
+            # Can't read OVS state - fall back to waiting out the timeout
+            time.sleep(max(0, deadline - time.monotonic()))
+            warn(f"  ⚠ Could not read controller state from OVS; waited "
+                 f"{time.monotonic() - start:.1f}s, continuing anyway.\n")
+            return
+        if expected <= connected:
+            info(f"  Done! ({time.monotonic() - start:.1f}s)\n")
+            return
+        time.sleep(0.25)
+    
+    missing = ', '.join(sorted(expected - connected))
+    warn(f"  ⚠ Timed out after {time.monotonic() - start:.1f}s with no controller "
+         f"connection on: {missing}. Continuing anyway.\n")
 
-def prime_network(client, server):
+def prime_network(client, server_ip):
     """
-    Prime the network with ARP packets to help learning switches
-    This allows switches to learn MAC addresses before actual tests
+    Prime the network with one ping to help learning switches
+    The ping resolves ARP and makes the controller install the path, so
+    switches learn MAC addresses before actual tests
+    Returns True if the ping was answered
     """
-    info(f"*** Priming switches with ARP packets...\n")
+    info(f"*** Priming switches with a ping...\n")
     
-    # Send ARP packets to populate switch MAC tables
-    client.cmd(f'arping -c 5 -I {client.name}-eth0 {server.IP()} > /dev/null 2>&1 &')
-    time.sleep(5)
+    # Foreground ping returns on the first reply (or after 2s), rather than
+    # sleeping 5s behind a backgrounded arping
+    result = client.cmd(f'ping -c 1 -W 2 {server_ip}')
+    primed = received_count(result) >= 1
     
-    info("  ✓ ARP priming complete\n")
+    info("  ✓ Priming complete\n" if primed else "  ⚠ Priming ping got no reply\n")
+    return primed
+
+def run_script(node, script, marker='__END__', timeout=30):
+    """
+    Run a multi-line shell script in a node's shell in one write
+    Mininet's shell prints its prompt (chr(127)) after every line, so the
+    output is read up to the prompt that follows the end marker
+    Returns the script output; if the shell closes or timeout seconds pass
+    first, warns and returns whatever was read
+    """
+    # Like node.cmd(), this needs the shell idle (no sendCmd() pending)
+    assert not node.waiting
+    node.write(f'{script}\necho {marker}\n')
+    
+    output = ''
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            warn(f"  ⚠ Script on {node.name} did not finish within {timeout}s\n")
+            break
+        if not node.waitReadable(remaining * 1000):
+            continue
+        data = node.read(1024)
+        if not data:
+            warn(f"  ⚠ Shell of {node.name} closed before the script finished\n")
+            break
+        output += data
+        end = output.find(marker)
+        if end != -1 and chr(127) in output[end:]:
+            return output[:end].replace(chr(127), '')
+    return output.replace(chr(127), '')
 
-def test_basic_connectivity(client, server):
+def test_basic_connectivity(client, server, server_ip):
     """
     Test basic connectivity with ping
     FIXED: More patient, allows for learning switch behavior
     """
     info(f"*** Testing connectivity: {client.name} -> {server.name}\n")
     
-    # Try up to 5 times with longer timeouts
-    for attempt in range(1, 6):
-        info(f"  Attempt {attempt}/5... ")
-        
-        # Send 5 pings with 2 second timeout each
-        result = client.cmd(f'ping -c 5 -W 2 -i 0.5 {server.IP()}')
-        
-        # Check how many packets were received
-        if '5 received' in result or '4 received' in result:
-            info("Excellent!\n")
-            return True
-        elif '3 received' in result or '2 received' in result:
-            info("Good!\n")
-            return True
-        elif '1 received' in result:
-            info("Partial (switches learning...)\n")
-            time.sleep(3)
-        else:
-            info("Failed (retrying...)\n")
-            time.sleep(3)
+    # With a -w deadline, -c is the number of replies to wait for: ping sends
+    # every 0.1s and exits on the first reply, or gives up after 2 seconds
+    result = client.cmd(f'ping -c 1 -i 0.1 -w 2 {server_ip}')
+    
+    if received_count(result) >= 1:
+        info("  Connected!\n")
+        return True
     
     # If we get here, connectivity failed
     info("\n  ⚠ Connectivity check failed, but this might be OK for learning switches\n")
@@ -88,54 +179,74 @@ def test_basic_connectivity(client, server):
     # Return True anyway - iperf will work even if initial pings fail
     return True
 
-def run_iperf_test(client, server, protocol, duration, output_file):
+def iperf_cpus():
+    """
+    Pick CPUs for the iperf3 server and client
+    CPUs 0-1 are left to the kernel (softirq) and OVS; iperf3 gets two of
+    the rest
+    Returns (server_cpu, client_cpu), or None if there are too few CPUs
+    """
+    cpus = sorted(os.sched_getaffinity(0) - {0, 1})
+    if len(cpus) < 2:
+        return None
+    return cpus[0], cpus[1]
+
+def run_iperf_test(client, server, server_ip, protocol, duration, output_file,
+                   port=5201, cpus=None):
     """
-    Run iperf3 test and capture output
+    Run iperf3 test, writing its JSON output straight to output_file
+    cpus is an optional (server_cpu, client_cpu) pair to pin iperf3 to
     
-    Returns: (success, output_text)
+    Returns: True if iperf3 exited successfully
     """
     info(f"*** Running {protocol.upper()} test ({duration}s)...\n")
     
-    # Clean up any existing iperf3 processes
-    server.cmd('pkill -9 iperf3')  
-    time.sleep(1)
+    # Clean up any existing iperf3 server on this port only (hosts share a
+    # PID namespace, so pkill would hit every iperf3), then start a new
+    # one - all in one round trip through the server's shell
+    # Pinning keeps scheduler noise out of the throughput and jitter numbers
+    server_pin, client_pin = (f'taskset -c {cpu} ' for cpu in cpus) if cpus else ('', '')
     
-    # Start iperf3 server
-    server.cmd('iperf3 -s -D') 
-    time.sleep(2)
+    ready = run_script(server, f"""fuser -k {port}/tcp > /dev/null 2>&1
+sleep 1
+{server_pin}iperf3 -s -p {port} -D
+sleep 1
+echo SRV_READY""")
+    if 'SRV_READY' not in ready:
+        info(f"  ⚠ iperf3 server on {server.name} may not have started\n")
     
     # Configure test based on protocol
     if protocol == 'udp':
-        cmd = f'iperf3 -c {server.IP()} -u -b 20M -t {duration} -J'
+        cmd = f'{client_pin}iperf3 -c {server_ip} -p {port} -u -b 20M -t {duration} -J'
     else:
-        cmd = f'iperf3 -c {server.IP()} -C {protocol} -t {duration} -J'
+        cmd = f'{client_pin}iperf3 -c {server_ip} -p {port} -C {protocol} -t {duration} -J'
     
     info(f"  Command: {cmd}\n")
-    output = client.cmd(cmd)
     
-    # Save output to file
-    with open(output_file, 'w') as f:
-        f.write(output)
+    # iperf3 writes the JSON to the file itself (--logfile appends, so the
+    # old file goes first); only the exit status comes back through the shell
+    logfile = os.path.abspath(output_file)
+    result = client.cmd(f'rm -f {logfile}; {cmd} --logfile {logfile}; echo DONE_$?')
     
     info(f"  Saved to: {output_file}\n")
     
-    # Check if test succeeded
-    success = 'error' not in output.lower() and len(output) > 100
+    # Check if test succeeded (iperf3 exits non-zero on errors)
+    success = 'DONE_0' in result
     
     # Clean up
-    server.cmd('pkill -9 iperf3')
+    server.cmd(f'fuser -k {port}/tcp > /dev/null 2>&1')
     
-    return success, output
+    return success
 
-def run_ping_test(client, server, count, output_file):
+def run_ping_test(client, server_ip, count, output_file):
     """
     Run ping test for latency and loss measurements
     
-    Returns: (success, output_text)
+    Returns: True if any ping was answered
     """
     info(f"*** Running ping test ({count} packets)...\n")
     
-    cmd = f'ping -c {count} -i 0.2 {server.IP()}'
+    cmd = f'ping -c {count} -i 0.2 {server_ip}'
     output = client.cmd(cmd)
     
     # Save output to file
@@ -145,9 +256,7 @@ def run_ping_test(client, server, count, output_file):
     info(f"  Saved to: {output_file}\n")
     
     # Check if test succeeded
-    success = 'bytes from' in output
-    
-    return success, output
+    return received_count(output) >= 1
 
 def run_experiment_set(controller_name, use_bottleneck=False):
     """
@@ -176,31 +285,39 @@ def run_experiment_set(controller_name, use_bottleneck=False):
     
     net = Mininet(
         topo=topo,
-        link=TCLink,
+        host=BatchedHost,
+        # Debug links have no tc params, so plain veths are enough there
+        link=TCLink if use_bottleneck else Link,
         controller=partial(RemoteController, ip='127.0.0.1', port=6633),
         switch=switch_class,
-        autoSetMacs=True
+        ipBase=IP_BASE,
+        autoSetMacs=True,
+        build=False
     )
     
     try:
         info("*** Starting network\n")
+        build_batched(net)  # all veth pairs in one ip -batch run
         net.start()
         
-        # FIXED: Wait longer for network convergence (40 seconds instead of 20)
+        # FIXED: Allow up to 40 seconds for network convergence (instead of 20)
         wait_for_convergence(net, timeout=40)
         
         # Get test hosts
         client = net.get('h1')
         server = net.get('h13')
         
-        info(f"*** Test hosts: {client.name} ({client.IP()}) -> "
-             f"{server.name} ({server.IP()})\n")
+        client_ip = client.IP()
+        server_ip = server.IP()
+        
+        info(f"*** Test hosts: {client.name} ({client_ip}) -> "
+             f"{server.name} ({server_ip})\n")
         
         # FIXED: Prime the network with ARP before testing
-        prime_network(client, server)
+        prime_network(client, server_ip)
         
         # FIXED: Test connectivity with more patience
-        if not test_basic_connectivity(client, server):
+        if not test_basic_connectivity(client, server, server_ip):
             print("\n✗ ERROR: Cannot establish connectivity!")
             print("  Make sure controller is running:")
             if controller_name == 'ryu':
@@ -211,7 +328,13 @@ def run_experiment_set(controller_name, use_bottleneck=False):
         
         print("\n✓ Network ready for experiments!\n")
         
-        # Test all three protocols
+        mode = 'bottleneck' if use_bottleneck else 'debug'
+        
+        cpus = iperf_cpus()
+        created = []
+        
+        # Test all three protocols, one at a time over the same primed
+        # h1 -> h13 path
         protocols = ['reno', 'cubic', 'udp']
         
         for protocol in protocols:
@@ -219,48 +342,51 @@ def run_experiment_set(controller_name, use_bottleneck=False):
             print(f"  TESTING: {protocol.upper()}")
             print(f"{'─'*70}\n")
             
-            mode = 'bottleneck' if use_bottleneck else 'debug'
             iperf_file = f"{OUTPUT_DIR}/{controller_name}_{mode}_{protocol}_iperf.json"
             ping_file = f"{OUTPUT_DIR}/{controller_name}_{mode}_{protocol}_ping.txt"
             
             # Run iperf test
-            success, output = run_iperf_test(client, server, protocol, 
-                                            TEST_DURATION, iperf_file)
+            success = run_iperf_test(client, server, server_ip, protocol, 
+                                     TEST_DURATION, iperf_file, cpus=cpus)
             
             if success:
-                info(f"  ✓ iperf test completed\n")
+                info(f"  ✓ {protocol} iperf test completed\n")
             else:
-                info(f"  ⚠ iperf test may have issues\n")
+                info(f"  ⚠ {protocol} iperf test may have issues\n")
             
             time.sleep(2)
             
             # Run ping test
-            success, output = run_ping_test(client, server, PING_COUNT, ping_file)
+            success = run_ping_test(client, server_ip, PING_COUNT, ping_file)
             
             if success:
-                info(f"  ✓ ping test completed\n")
+                info(f"  ✓ {protocol} ping test completed\n")
             else:
-                info(f"  ⚠ ping test may have issues\n")
+                info(f"  ⚠ {protocol} ping test may have issues\n")
             
             time.sleep(2)
+            
+            created += [iperf_file, ping_file]
         
         print("\n" + "="*70)
         print("  EXPERIMENT SET COMPLETE")
         print("="*70 + "\n")
         
-        # Show generated files
+        # Show generated files (only the ones this run wrote, rather than
+        # scanning the whole results directory)
         print("Generated files:")
-        for filename in sorted(os.listdir(OUTPUT_DIR)):
-            if controller_name in filename and mode in filename:
-                filepath = os.path.join(OUTPUT_DIR, filename)
+        for filepath in sorted(created):
+            try:
                 size = os.path.getsize(filepath)
-                print(f"  {filename}: {size} bytes")
+            except OSError:
+                print(f"  {os.path.basename(filepath)}: missing")
+                continue
+            print(f"  {os.path.basename(filepath)}: {size} bytes")
         
         return True
         
     except Exception as e:
         print(f"\n✗ Error: {e}")
-        import traceback
         traceback.print_exc()
         return False
         
@@ -270,16 +396,11 @@ def run_experiment_set(controller_name, use_bottleneck=False):
 
 def check_controller_running():
     """Check if a controller is running on port 6633"""
-    try:
-        result = subprocess.run(['ss', '-tlnp'], capture_output=True, text=True)
-        if ':6633' in result.stdout:
-            return True
-        result = subprocess.run(['netstat', '-tlnp'], capture_output=True, text=True)
-        if ':6633' in result.stdout:
-            return True
-    except:
-        pass
-    return False
+    # A TCP connect only succeeds if something is listening, without
+    # forking ss/netstat
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.2)
+        return sock.connect_ex(('127.0.0.1', 6633)) == 0
 
 def main():
     """Main experiment runner"""
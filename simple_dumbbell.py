@@ -6,7 +6,72 @@ Simple Dumbbell Topology for 5718 Project
 - Configurable bottleneck link
 """
 
+import subprocess
+from collections import deque
+from functools import cached_property
+from itertools import chain
+from mininet.log import info
+from mininet.node import Host
 from mininet.topo import Topo
+from link_params import parse_ms, bdp_queue_packets
+
+# Host subnet; pass as Mininet(ipBase=IP_BASE) (or 'mn --ipbase') and hosts
+# are numbered in order, h1 = 10.0.0.1 ... h22 = 10.0.0.22
+IP_BASE = '10.0.0.0/24'
+
+# Host names and MACs for every address IP_BASE can hand out (h1-h254),
+# formatted once; hN is _NAMES[N - 1]
+_NAMES = tuple(f'h{i}' for i in range(1, 255))
+_MACS = tuple(f'00:00:00:00:00:{i:02x}' for i in range(1, 255))
+
+def _host_specs(edge_switches, num_hosts, hosts_per_edge):
+    """
+    (name, mac, switch) for h1..hN, consecutive host numbers filling each
+    edge switch in turn. MACs are fixed (hN = 00:00:00:00:00:N, as
+    autoSetMacs would give) so they don't depend on how the network is
+    started; IPs are left to Mininet, which allocates them from IP_BASE in
+    host-number order
+    """
+    if num_hosts > len(_NAMES):
+        raise ValueError(f"{num_hosts} hosts don't fit in {IP_BASE}")
+    if num_hosts > len(edge_switches) * hosts_per_edge:
+        raise ValueError(f"{num_hosts} hosts don't fit on {len(edge_switches)} "
+                         f"edge switches with {hosts_per_edge} hosts each")
+    hosts = range(num_hosts)
+    host_plan = [(switch, hosts[k * hosts_per_edge:(k + 1) * hosts_per_edge])
+                 for k, switch in enumerate(edge_switches)]
+    return tuple((_NAMES[i], _MACS[i], switch)
+                 for switch, i in chain.from_iterable(
+                     ((switch, i) for i in chunk)
+                     for switch, chunk in host_plan))
+
+class BatchedHost(Host):
+    """
+    Host that sets its MAC, IP and loopback with one 'ip -batch' run in its
+    shell, where Node.config issues five separate ifconfig commands
+    Use as Mininet(host=BatchedHost) (or 'mn --host batched')
+    """
+    
+    def config(self, mac=None, ip=None, defaultRoute=None, lo='up', **_params):
+        r = {}
+        lines = []
+        if mac is not None or ip is not None:
+            intf = self.defaultIntf()
+            if mac is not None:
+                intf.mac = r['mac'] = mac
+                lines += [f'link set {intf} down', f'link set {intf} address {mac}']
+            if ip is not None:
+                if '/' not in ip:
+                    ip += '/8'  # Node.setIP's default prefix length
+                intf.ip, intf.prefixLen = ip.split('/')
+                r['ip'] = ip
+                lines.append(f'addr replace {ip} brd + dev {intf}')
+            lines.append(f'link set {intf} up')
+        lines.append(f'link set lo {lo}')
+        self.cmd("printf '%s\\n' " + ' '.join(f"'{line}'" for line in lines)
+                 + ' | ip -batch -')
+        self.setParam(r, 'setDefaultRoute', defaultRoute=defaultRoute)
+        return r
 
 class SimpleDumbbellTopo(Topo):
     """
@@ -34,78 +99,190 @@ class SimpleDumbbellTopo(Topo):
     Total: 22 hosts, 6 switches (s1-s6), 2 core routers (r1, r2)
     """
     
+    # Fixed part of the topology, decided once and shared by every
+    # instance: switches are addSwitch()ed in this order, then each edge
+    # switch is linked to its core
+    SWITCHES = ('r1', 'r2', 's1', 's2', 's3', 's4', 's5', 's6')
+    BACKBONE = (('s1', 'r1'), ('s2', 'r1'), ('s3', 'r1'),
+                ('s4', 'r2'), ('s5', 'r2'), ('s6', 'r2'))
+    # Edge switches in the order they are filled with hosts
+    EDGE_SWITCHES = ('s1', 's2', 's4', 's5', 's6', 's3')
+    # Default layout: h1-h4 on s1, h5-h8 on s2, h9-h12 on s4, h13-h16 on
+    # s5, h17-h20 on s6 and h21-h22 on s3
+    HOSTS = _host_specs(EDGE_SWITCHES, 22, 4)
+    
     def build(self, bottleneck_bw=10, bottleneck_delay='50ms', 
-              bottleneck_loss=1, use_bottleneck=False):
+              bottleneck_loss=1, use_bottleneck=False, num_hosts=22,
+              hosts_per_edge=4):
         """
         Args:
             bottleneck_bw: Bottleneck bandwidth in Mbps (default: 10)
             bottleneck_delay: Bottleneck delay (default: '50ms')
             bottleneck_loss: Bottleneck packet loss % (default: 1)
             use_bottleneck: If False, use high-speed link for testing (default: False)
+            num_hosts: Number of hosts, h1..hN (default: 22)
+            hosts_per_edge: Hosts per edge switch, filled in the order
+                s1, s2, s4, s5, s6, s3 (default: 4)
         """
+        addSwitch, addHost, addLink = self.addSwitch, self.addHost, self.addLink
         
-        r1 = self.addSwitch('r1')
-        r2 = self.addSwitch('r2')
+        # batch=True makes OVSSwitch queue its ovs-vsctl commands instead of
+        # running one per switch; Mininet's start() then creates every
+        # bridge and port in a single ovs-vsctl transaction (batchStartup)
+        for name in self.SWITCHES:
+            addSwitch(name, batch=True)
         
-        s1 = self.addSwitch('s1')
-        s2 = self.addSwitch('s2')
-        s3 = self.addSwitch('s3')
-        s4 = self.addSwitch('s4')
-        s5 = self.addSwitch('s5')
-        s6 = self.addSwitch('s6')
+        # Backbone links are only shaped (1Gbps) alongside the bottleneck; in
+        # debug mode they carry no tc params, so with link=Link Mininet skips
+        # the ethtool/tc setup on every interface
+        link_kw = {'bw': 1000} if use_bottleneck else {}
         
-        self.addLink(s1, r1, bw=1000)
-        self.addLink(s2, r1, bw=1000)
-        self.addLink(s3, r1, bw=1000)
-        self.addLink(s4, r2, bw=1000)
-        self.addLink(s5, r2, bw=1000)
-        self.addLink(s6, r2, bw=1000)
+        for switch, core in self.BACKBONE:
+            addLink(switch, core, **link_kw)
         
         if use_bottleneck:
-            self.addLink(r1, r2, bw=bottleneck_bw, delay=bottleneck_delay, 
-                        loss=bottleneck_loss, max_queue_size=100)
-            print(f"*** Using BOTTLENECK: {bottleneck_bw}Mbps, "
-                  f"{bottleneck_delay} delay, {bottleneck_loss}% loss")
+            queue_pkts = bdp_queue_packets(bottleneck_bw, bottleneck_delay)
+            addLink('r1', 'r2', bw=bottleneck_bw, delay=bottleneck_delay, 
+                    loss=bottleneck_loss, max_queue_size=queue_pkts)
+            info('*** Using BOTTLENECK: %sMbps, %s delay, %s%% loss, %s packet queue\n',
+                 bottleneck_bw, bottleneck_delay, bottleneck_loss, queue_pkts)
         else:
-            self.addLink(r1, r2, bw=1000)
-            print("*** Using DEBUG MODE: 1Gbps link (no constraints)")
-        
-        # Create hosts and connect to switches
-        # Left side - s1 (h1-h4)
-        for i in range(1, 5):
-            h = self.addHost(f'h{i}', ip=f'10.0.0.{i}/24')
-            self.addLink(h, s1)
-        
-        # Left side - s2 (h5-h8)
-        for i in range(5, 9):
-            h = self.addHost(f'h{i}', ip=f'10.0.0.{i}/24')
-            self.addLink(h, s2)
-        
-        # Left side - s3 (h9-h12) - Wait, let's keep it simple
+            addLink('r1', 'r2')
+            info('*** Using DEBUG MODE: unshaped links (no constraints)\n')
         
-        # Right side - s4 (h9-h12)
-        for i in range(9, 13):
-            h = self.addHost(f'h{i}', ip=f'10.0.0.{i}/24')
-            self.addLink(h, s4)
+        # Create hosts and connect them to their edge switches
+        if (num_hosts, hosts_per_edge) == (22, 4):
+            host_specs = self.HOSTS
+        else:
+            host_specs = _host_specs(self.EDGE_SWITCHES, num_hosts, hosts_per_edge)
         
-        # Right side - s5 (h13-h16)
-        for i in range(13, 17):
-            h = self.addHost(f'h{i}', ip=f'10.0.0.{i}/24')
-            self.addLink(h, s5)
+        for name, mac, switch in host_specs:
+            addLink(addHost(name, mac=mac), switch)
+    
+    @cached_property
+    def delay_index(self):
+        """Row/column of each node name in delay_matrix"""
+        return {name: i for i, name in enumerate(self.nodes())}
+    
+    @cached_property
+    def delay_matrix(self):
+        """
+        One-way delay in ms along the lowest-delay path between every pair
+        of nodes, from the configured link delays (no pings needed):
+        delay_matrix[delay_index['h1'], delay_index['h13']]
+        Computed on first access; None if scipy isn't installed
+        """
+        try:
+            # Optional, and imported only here so topology users who never
+            # ask for delays don't pay scipy's import time
+            from scipy.sparse import csr_matrix
+            from scipy.sparse.csgraph import dijkstra
+        except ImportError:
+            return None
         
-        # Right side - s6 (h17-h20)
-        for i in range(17, 21):
-            h = self.addHost(f'h{i}', ip=f'10.0.0.{i}/24')
-            self.addLink(h, s6)
+        index = self.delay_index
+        rows, cols, delays = zip(*((index[a], index[b], parse_ms(params.get('delay', 0)))
+                                   for a, b, params in self.links(withInfo=True)))
+        # Explicit zeros stay edges in a sparse graph, so undelayed links
+        # still connect
+        graph = csr_matrix((delays, (rows, cols)), shape=(len(index), len(index)))
+        return dijkstra(graph, directed=False)
+    
+    def shortest_path(self, src, dst):
+        """Node names along a fewest-hops path from src to dst"""
+        # Breadth-first search over the link list
+        neighbors = {}
+        for a, b in self.links():
+            neighbors.setdefault(a, []).append(b)
+            neighbors.setdefault(b, []).append(a)
+        previous = {src: None}
+        queue = deque([src])
+        while queue:
+            node = queue.popleft()
+            if node == dst:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = previous[node]
+                return path[::-1]
+            for neighbor in neighbors.get(node, ()):
+                if neighbor not in previous:
+                    previous[neighbor] = node
+                    queue.append(neighbor)
+        raise ValueError(f"No path between {src} and {dst}")
+
+def build_batched(net):
+    """
+    Build a Mininet created with build=False, making every veth pair in its
+    topology with one 'ip -batch' run instead of an 'ip link add' per link
+    """
+    link_cls = net.link
+    # intf1 name -> (intf2 name, mac1, mac2) for pairs the batch created
+    pending = None
+    
+    def create_all():
+        # Called on the first link, once every node (and its namespace)
+        # exists. MACs are picked here, as Mininet.addLink would, so the
+        # kernel's addresses match the ones each Intf records
+        created = {}
+        commands = []
+        for _, _, params in net.topo.links(withInfo=True):
+            node1, node2 = net[params['node1']], net[params['node2']]
+            intf1 = f"{node1.name}-eth{params['port1']}"
+            intf2 = f"{node2.name}-eth{params['port2']}"
+            mac1, mac2 = net.randMac(), net.randMac()
+            commands.append(f"link add name {intf1} address {mac1} netns {node1.pid} "
+                            f"type veth peer name {intf2} address {mac2} "
+                            f"netns {node2.pid}\n")
+            created[intf1] = (intf2, mac1, mac2)
+        result = subprocess.run(['ip', '-batch', '-'], input=''.join(commands),
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"Error creating interface pairs: {result.stderr}")
+        return created
+    
+    class BatchedLink(link_cls):
+        def __init__(self, node1, node2, port1=None, port2=None, **params):
+            nonlocal pending
+            if pending is None:
+                pending = create_all()
+            made = pending.get(f'{node1.name}-eth{port1}')
+            if made and made[0] == f'{node2.name}-eth{port2}':
+                # Record the MACs the batch gave this pair
+                params.update(addr1=made[1], addr2=made[2])
+            super().__init__(node1, node2, port1=port1, port2=port2, **params)
         
-        # Additional hosts for s3 (h21-h22) to reach 22 total
-        for i in range(21, 23):
-            h = self.addHost(f'h{i}', ip=f'10.0.0.{i}/24')
-            self.addLink(h, s3)
+        @classmethod
+        def makeIntfPair(cls, intfname1, intfname2, addr1=None, addr2=None,
+                         node1=None, node2=None, deleteIntfs=True, runCmd=None):
+            made = pending.pop(intfname1, None) if pending else None
+            if made and made[0] == intfname2:
+                return None
+            # runCmd only exists in newer Mininet releases
+            extra = {'runCmd': runCmd} if runCmd else {}
+            return super().makeIntfPair(intfname1, intfname2, addr1, addr2,
+                                        node1, node2, deleteIntfs=deleteIntfs, **extra)
+    
+    net.link = BatchedLink
+    try:
+        net.build()
+    finally:
+        net.link = link_cls
 
-# Topos available for 'mn --custom' command
+# Topos available for 'mn --custom' command (use with --ipbase=10.0.0.0/24)
 topos = {
     'simple_dumbbell': SimpleDumbbellTopo,
     'debug': lambda: SimpleDumbbellTopo(use_bottleneck=False),
-    'project': lambda: SimpleDumbbellTopo(use_bottleneck=True)
+    'project': lambda: SimpleDumbbellTopo(use_bottleneck=True),
+    # Bottleneck sweeps without subclassing, e.g. --topo project_param,bw=50
+    'project_param': lambda bw=10, delay='50ms', loss=1: SimpleDumbbellTopo(
+        use_bottleneck=True, bottleneck_bw=bw, bottleneck_delay=delay,
+        bottleneck_loss=loss),
+    # One host per edge switch (h1-h6): quick smoke tests that still
+    # cross r1-r2
+    'debug_small': lambda: SimpleDumbbellTopo(use_bottleneck=False, num_hosts=6,
+                                              hosts_per_edge=1)
 }
+
+# Host classes for 'mn --custom', e.g. --host batched
+hosts = {'batched': BatchedHost}